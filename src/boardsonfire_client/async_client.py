@@ -0,0 +1,658 @@
+import asyncio
+import json
+import logging
+import time
+
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .client import Response, orjson, _encode_json, _pagination
+from .endpoints import (
+    MAX_PAGE_SIZE,
+    UPSERT_BATCH_SIZE,
+    ValidateEntity,
+    ValidateDataSource,
+    _batches,
+)
+from .exceptions import RateLimitException, NotFoundException, RestClientException
+from .ratelimit import RateLimiter, retry_delay, exhausted_delay
+
+
+async def _paginate(
+    fetch: Callable[[int], Awaitable[Response]],
+    page_size: int,
+    limit: int = None,
+    concurrency: int = 16,
+) -> AsyncIterator[Dict]:
+    """
+    Iterate over a paginated endpoint, fetching pages concurrently.
+
+    The first page is fetched on its own so small result sets cost a single request.
+    After that, pages are fetched in batches of `concurrency` and yielded in order
+    until a short page is received or the limit is reached. If the first response
+    carries a total count, no pages beyond it are requested.
+
+    Args:
+        fetch (Callable[[int], Awaitable[Response]]): Coroutine function returning the response for a page number.
+        page_size (int): The number of records requested per page.
+        limit (int, optional): The maximum number of records to yield. Defaults to None.
+        concurrency (int, optional): The number of pages to fetch at once. Defaults to 16.
+
+    Yields:
+        AsyncIterator[Dict]: An iterator over the records.
+    """
+    last_page = -(-limit // page_size) if limit else None
+    yield_count = 0
+    page = 1
+    batch = [fetch(page)]
+    while batch:
+        for response in await asyncio.gather(*batch):
+            for record in response.data:
+                yield_count += 1
+                yield record
+
+                if limit and yield_count >= limit:
+                    return
+
+            if not response.data or len(response.data) < page_size:
+                return
+            if response.has_next is False:
+                return
+
+            if response.total is not None:
+                total_pages = -(-response.total // page_size)
+                if last_page is None or total_pages < last_page:
+                    last_page = total_pages
+
+        next_page = page + len(batch)
+        stop = next_page + concurrency
+        if last_page is not None:
+            stop = min(stop, last_page + 1)
+        batch = [fetch(p) for p in range(next_page, stop)]
+        page = next_page
+
+
+class AsyncBoardsOnFireClient:
+    """
+    An asyncio client for interacting with the BoardsOnFire API.
+
+    Mirrors BoardsOnFireClient, but every endpoint method is a coroutine and the
+    list_all methods are async iterators that fetch pages concurrently.
+
+    Args:
+        domain (str): The domain of the BoardsOnFire instance.
+        api_key (str): The API key for authentication.
+        version (str, optional): The version of the API to use. Defaults to "v5".
+        logger (logging.Logger, optional): The logger to use. Defaults to the module logger.
+        concurrency (int, optional): The maximum number of concurrent requests. Defaults to 16.
+        rate_limit (Tuple[int, float], optional): Send at most this many requests per this many seconds,
+            e.g. (100, 60). Defaults to None (no client side limit).
+        max_retries (int, optional): How many times to retry a request that was rate limited
+            before raising RateLimitException. Defaults to 3.
+
+    The underlying aiohttp session is created on first use and shared by all requests.
+    Call close() when done, or use the client as an async context manager.
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        api_key: str,
+        version: str = "v5",
+        logger: logging.Logger = None,
+        concurrency: int = 16,
+        rate_limit: Tuple[int, float] = None,
+        max_retries: int = 3,
+    ):
+        self._logger = logger or logging.getLogger(__name__)
+
+        self._domain = domain
+        self._url = f"https://{domain}.boardsonfireapp.com/api/{version}/"
+        self._api_key = api_key
+        self._version = version
+        self._concurrency = concurrency
+        self._rate_limiter = RateLimiter(*rate_limit) if rate_limit else None
+        self._max_retries = max_retries
+        # monotonic time before which the server asked us not to send requests
+        self._resume_at = 0.0
+        self._session = None
+
+        self.organizations = AsyncOrganizations(self)
+        self.users = AsyncUsers(self)
+        self.entities = AsyncEntities(self)
+        self.datasources = AsyncDataSources(self)
+
+    async def __aenter__(self) -> "AsyncBoardsOnFireClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={"x-api-key": self._api_key},
+                connector=aiohttp.TCPConnector(limit_per_host=self._concurrency),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the underlying HTTP session and release its pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict = None,
+        data: Dict = None,
+        headers: Dict = None,
+        return_response: bool = True,
+    ) -> Optional[Response]:
+        """
+        Sends a request to the BoardsOnFire API.
+
+        Rate limited requests are retried up to max_retries times, waiting as long as the
+        server asks via its rate limit headers or backing off exponentially otherwise.
+        A response reporting no remaining requests delays the next request until the reset.
+
+        Args:
+            method (str): The HTTP method for the request.
+            endpoint (str): The API endpoint to send the request to.
+            params (Dict, optional): The query parameters for the request. Defaults to None.
+            data (Dict, optional): The request body data. Defaults to None.
+            headers (Dict, optional): Additional headers for the request. Defaults to None.
+            return_response (bool, optional): Whether a successful DELETE returns a Response. Defaults to True.
+
+        Returns:
+            Optional[Response]: The response from the API, None for a DELETE without return_response.
+
+        Raises:
+            RateLimitException: If the rate limit is still exceeded after all retries.
+            NotFoundException: If the requested resource is not found.
+            RestClientException: If the response is not successful or does not contain valid JSON.
+        """
+        if params is not None:
+            # aiohttp rejects None values, requests silently drops them
+            params = {k: v for k, v in params.items() if v is not None}
+
+        body = _encode_json(data)
+        if body is not None:
+            payload = {"data": body}
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        else:
+            payload = {"json": data}
+
+        session = self._get_session()
+        for attempt in range(self._max_retries + 1):
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if self._rate_limiter is not None:
+                await self._rate_limiter.async_acquire()
+
+            async with session.request(
+                method, self._url + endpoint, params=params, headers=headers, **payload
+            ) as response:
+                content = await response.read()
+
+            if response.status != 429 or attempt == self._max_retries:
+                break
+
+            delay = retry_delay(response.headers, attempt)
+            self._logger.warning(f"Rate limit exceeded, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        if response.ok:
+            delay = exhausted_delay(response.headers)
+            if delay:
+                self._logger.info(
+                    f"No requests remaining, pausing the next request for {delay:.1f}s"
+                )
+                self._resume_at = time.monotonic() + delay
+
+            if method == "DELETE":
+                if not return_response:
+                    return None
+                return Response(status_code=response.status, headers=response.headers)
+
+            try:
+                if orjson is not None:
+                    data = orjson.loads(content)
+                else:
+                    data = json.loads(content)
+            except ValueError:
+                raise RestClientException("Response does not contain valid json")
+            return Response(
+                status_code=response.status,
+                headers=response.headers,
+                data=data,
+                **_pagination(response.headers),
+            )
+
+        if response.status == 429:
+            raise RateLimitException("Rate limit exceeded")
+        if response.status == 404:
+            raise NotFoundException("Resource not found")
+        raise RestClientException(
+            f"Bad response. \n Status Code: {response.status}\n  Message: {content}"
+        )
+
+    async def _get(
+        self, endpoint: str, params: Dict = None, data: Dict = None
+    ) -> Response:
+        return await self._send_request("GET", endpoint, params=params, data=data)
+
+    async def _post(
+        self, endpoint: str, params: Dict = None, data: Dict = None
+    ) -> Response:
+        return await self._send_request("POST", endpoint, params=params, data=data)
+
+    async def _delete(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        data: Dict = None,
+        return_response: bool = False,
+    ) -> Optional[Response]:
+        return await self._send_request(
+            "DELETE",
+            endpoint,
+            params=params,
+            data=data,
+            return_response=return_response,
+        )
+
+    async def _patch(
+        self, endpoint: str, params: Dict = None, data: Dict = None
+    ) -> Response:
+        return await self._send_request("PATCH", endpoint, params=params, data=data)
+
+
+def _truncate_page_size(rest_client: AsyncBoardsOnFireClient, page_size: int) -> int:
+    if page_size > MAX_PAGE_SIZE:
+        rest_client._logger.warning(
+            (
+                f"The maximum page size is {MAX_PAGE_SIZE}. Response is truncated. \n"
+                f"Please consider using the list_all method for large datasets."
+            )
+        )
+        return MAX_PAGE_SIZE
+    return page_size
+
+
+class AsyncOrganizations:
+    """
+    Represents a collection of coroutines for interacting with organizations.
+    """
+
+    def __init__(self, rest_client: AsyncBoardsOnFireClient):
+        self.rest_client = rest_client
+
+    async def list(
+        self,
+        page_size: int = 50,
+        page: int = 1,
+        order_by: str = None,
+        direction: str = "ASC",
+    ) -> List[Dict]:
+        """
+        List organizations. See Organizations.list.
+        """
+        params = {
+            "page_size": _truncate_page_size(self.rest_client, page_size),
+            "page": page,
+            "order": order_by,
+            "direction": direction,
+        }
+        response = await self.rest_client._get("organizations", params=params)
+        return response.data
+
+    async def list_all(
+        self, limit: int = None, order_by: str = None, direction: str = "ASC"
+    ) -> AsyncIterator[Dict]:
+        """
+        List all organizations, fetching pages concurrently. See Organizations.list_all.
+        """
+        params = {
+            "page_size": min(100, limit if limit else 100),
+            "order": order_by,
+            "direction": direction,
+        }
+
+        def fetch(page: int) -> Awaitable[Response]:
+            return self.rest_client._get(
+                "organizations", params={**params, "page": page}
+            )
+
+        async for record in _paginate(
+            fetch, params["page_size"], limit, self.rest_client._concurrency
+        ):
+            yield record
+
+    async def get(self, id: str) -> Dict:
+        """
+        Get an organization by ID. See Organizations.get.
+        """
+        response = await self.rest_client._get(f"organizations/{id}")
+        return response.data
+
+
+class AsyncUsers:
+    """
+    Represents a collection of coroutines for interacting with users.
+    """
+
+    def __init__(self, rest_client: AsyncBoardsOnFireClient):
+        self.rest_client = rest_client
+
+    async def list(
+        self,
+        page_size: int = 100,
+        page: int = 1,
+        order_by: str = None,
+        direction: str = "ASC",
+    ) -> List[Dict]:
+        """
+        List users. See Users.list.
+        """
+        params = {
+            "page_size": _truncate_page_size(self.rest_client, page_size),
+            "page": page,
+            "order": order_by,
+            "direction": direction,
+        }
+        response = await self.rest_client._get("users", params=params)
+        return response.data
+
+    async def list_all(
+        self, limit: int = None, order_by: str = None, direction: str = "ASC"
+    ) -> AsyncIterator[Dict]:
+        """
+        List all users, fetching pages concurrently. See Users.list_all.
+        """
+        params = {
+            "page_size": min(100, limit if limit else 100),
+            "order": order_by,
+            "direction": direction,
+        }
+
+        def fetch(page: int) -> Awaitable[Response]:
+            return self.rest_client._get("users", params={**params, "page": page})
+
+        async for record in _paginate(
+            fetch, params["page_size"], limit, self.rest_client._concurrency
+        ):
+            yield record
+
+    async def get(self, id: str) -> Dict:
+        """
+        Get a user by ID. See Users.get.
+        """
+        response = await self.rest_client._get(f"users/{id}")
+        return response.data
+
+
+class AsyncEntities:
+    """
+    Represents a collection of coroutines for interacting with entites.
+    """
+
+    def __init__(self, rest_client: AsyncBoardsOnFireClient):
+        self.rest_client = rest_client
+
+    async def list(
+        self,
+        entity_name: str,
+        organizations: Optional[List[str]] = None,
+        page_size: int = 100,
+        page: int = 1,
+        order: str = None,
+        group: str = None,
+        filter: str = None,
+    ) -> List[Dict]:
+        """
+        List entity objects. See Entities.list.
+        """
+        params = {
+            "page_size": _truncate_page_size(self.rest_client, page_size),
+            "page": page,
+            "order": order,
+            "group": group,
+            "filter": filter,
+        }
+        if organizations:
+            params["target_organization_ids"] = ",".join(organizations)
+        response = await self.rest_client._post(
+            f"entities/{entity_name}/entityobjects/list", params=params
+        )
+        return response.data
+
+    async def list_all(
+        self,
+        entity_name: str,
+        limit: int = None,
+        organizations: Optional[List[str]] = None,
+        order: str = None,
+        group: str = None,
+        filter: str = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        List all entity objects, fetching pages concurrently. See Entities.list_all.
+        """
+        params = {
+            "page_size": min(100, limit if limit else 100),
+            "order": order,
+            "group": group,
+            "filter": filter,
+        }
+        if organizations:
+            params["target_organization_ids"] = ",".join(organizations)
+        endpoint = f"entities/{entity_name}/entityobjects/list"
+
+        def fetch(page: int) -> Awaitable[Response]:
+            return self.rest_client._post(endpoint, params={**params, "page": page})
+
+        async for record in _paginate(
+            fetch, params["page_size"], limit, self.rest_client._concurrency
+        ):
+            yield record
+
+    async def get(self, entity_name: str, id: str) -> Dict:
+        """
+        Get an entity object by ID. See Entities.get.
+        """
+        response = await self.rest_client._get(
+            f"entities/{entity_name}/entityobjects/{id}"
+        )
+        return response.data
+
+    async def update(self, entity_name: str, id: str, data: Dict) -> Dict:
+        """
+        Update an entity object. See Entities.update.
+        """
+        response = await self.rest_client._patch(
+            f"entities/{entity_name}/entityobjects/{id}", data=data
+        )
+        return response.data
+
+    async def create(self, entity_name: str, data: Dict) -> Dict:
+        """
+        Create an entity object. See Entities.create.
+        """
+        ValidateEntity.create(data)
+
+        response = await self.rest_client._post(
+            f"entities/{entity_name}/entityobjects", data=data
+        )
+        return response.data
+
+    async def upsert(
+        self,
+        entity_name: str,
+        data: List[Dict],
+        truncate: bool = False,
+        batch_size: int = UPSERT_BATCH_SIZE,
+    ) -> List[str]:
+        """
+        Upsert entity objects, sending the batches concurrently. See Entities.upsert.
+
+        If a batch fails its exception is raised, while the other batches keep running
+        and may still be imported.
+        """
+        ValidateEntity.upsert(data)
+
+        endpoint = f"entities/{entity_name}/entityobjects/import"
+        if truncate:
+            batch_size = None
+
+        responses = await asyncio.gather(
+            *(
+                self.rest_client._post(
+                    endpoint, data={"entity_objects": batch, "delete_others": truncate}
+                )
+                for batch in _batches(data, batch_size)
+            )
+        )
+        if len(responses) == 1:
+            return responses[0].data
+        return [id for response in responses for id in response.data]
+
+    async def delete(self, entity_name: str, id: str) -> None:
+        """
+        Delete an entity object. See Entities.delete.
+        """
+        await self.rest_client._delete(f"entities/{entity_name}/entityobjects/{id}")
+
+
+class AsyncDataSources:
+    """
+    Represents a collection of coroutines for interacting with data sources.
+    """
+
+    def __init__(self, rest_client: AsyncBoardsOnFireClient):
+        self.rest_client = rest_client
+
+    async def list(
+        self,
+        datasource_name: str,
+        organizations: Optional[List[str]] = None,
+        page_size: int = 100,
+        page: int = 1,
+        order: str = None,
+        group: str = None,
+        filter: str = None,
+    ) -> List[Dict]:
+        """
+        List data objects from a datasource. See DataSources.list.
+        """
+        body = {
+            "page_size": _truncate_page_size(self.rest_client, page_size),
+            "page": page,
+            "order": order,
+            "group": group,
+            "filter": filter,
+        }
+        if organizations:
+            body["target_organization_ids"] = ",".join(organizations)
+        response = await self.rest_client._post(
+            f"datasources/{datasource_name}/dataobjects/list", data=body
+        )
+        return response.data
+
+    async def list_all(
+        self,
+        datasource_name: str,
+        limit: int = None,
+        organizations: Optional[List[str]] = None,
+        order: str = None,
+        group: str = None,
+        filter: str = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        List all data objects from a datasource, fetching pages concurrently. See DataSources.list_all.
+        """
+        body = {
+            "page_size": min(100, limit if limit else 100),
+            "order": order,
+            "group": group,
+            "filter": filter,
+        }
+        if organizations:
+            body["target_organization_ids"] = ",".join(organizations)
+        endpoint = f"datasources/{datasource_name}/dataobjects/list"
+
+        def fetch(page: int) -> Awaitable[Response]:
+            return self.rest_client._post(endpoint, data={**body, "page": page})
+
+        async for record in _paginate(
+            fetch, body["page_size"], limit, self.rest_client._concurrency
+        ):
+            yield record
+
+    async def get(self, datasource_name: str, id: str) -> Dict:
+        """
+        Get a specific data object from a datasource. See DataSources.get.
+        """
+        response = await self.rest_client._get(
+            f"datasources/{datasource_name}/dataobjects/{id}"
+        )
+        return response.data
+
+    async def update(self, datasource_name: str, id: str, data: Dict) -> Dict:
+        """
+        Update a specific data object in a datasource. See DataSources.update.
+        """
+        response = await self.rest_client._patch(
+            f"datasources/{datasource_name}/dataobjects/{id}", data=data
+        )
+        return response.data
+
+    async def create(self, datasource_name: str, data: Dict) -> Dict:
+        """
+        Create a new data object in a datasource. See DataSources.create.
+        """
+        ValidateDataSource.create(data)
+
+        response = await self.rest_client._post(
+            f"datasources/{datasource_name}/dataobjects", data=data
+        )
+        return response.data
+
+    async def upsert(
+        self,
+        datasource_name: str,
+        data: List[Dict],
+        batch_size: int = UPSERT_BATCH_SIZE,
+    ) -> List[str]:
+        """
+        Upsert (insert or update) multiple data objects in a datasource, sending the
+        batches concurrently. See DataSources.upsert.
+
+        If a batch fails its exception is raised, while the other batches keep running
+        and may still be imported.
+        """
+        ValidateDataSource.upsert(data)
+
+        endpoint = f"datasources/{datasource_name}/dataobjects/import"
+        responses = await asyncio.gather(
+            *(
+                self.rest_client._post(endpoint, data=batch)
+                for batch in _batches(data, batch_size)
+            )
+        )
+        if len(responses) == 1:
+            return responses[0].data
+        return [id for response in responses for id in response.data]
+
+    async def delete(self, datasource_name: str, id: str) -> None:
+        """
+        Delete a specific data object from a datasource. See DataSources.delete.
+        """
+        await self.rest_client._delete(
+            f"datasources/{datasource_name}/dataobjects/{id}"
+        )
@@ -1,19 +1,124 @@
 import requests
 import logging
+import time
 
-from json import JSONDecodeError
-from dataclasses import dataclass
-from typing import List, Dict
+from requests.adapters import HTTPAdapter
 
+from json import JSONDecodeError
+from typing import (
+    Any,
+    List,
+    Dict,
+    Iterator,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .endpoints import Users, Organizations, Entities, DataSources
 from .exceptions import RateLimitException, NotFoundException, RestClientException
+from .ratelimit import RateLimiter, retry_delay, exhausted_delay
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
-@dataclass
-class Response:
+
+class Response(NamedTuple):
     status_code: int
     headers: Dict
     message: str = ""
-    data: List[Dict] = None
+    # a list or dict of parsed JSON, or an iterator over the items of a streamed response
+    data: Optional[Union[List[Dict], Dict, Iterator[Dict]]] = None
+    total: Optional[int] = None
+    has_next: Optional[bool] = None
+
+
+def _pagination(headers: Mapping) -> Dict:
+    """
+    Read the pagination hints a response may carry in its headers.
+
+    Args:
+        headers (Mapping): The response headers.
+
+    Returns:
+        Dict: The total and has_next fields for Response, None where the headers don't say.
+    """
+    total = headers.get("X-Total-Count")
+    link = headers.get("Link")
+    next_page = headers.get("X-Next-Page")
+
+    has_next = None
+    if isinstance(link, str):
+        has_next = 'rel="next"' in link
+    elif isinstance(next_page, str):
+        has_next = bool(next_page.strip())
+
+    return {
+        "total": int(total) if isinstance(total, str) and total.isdigit() else None,
+        "has_next": has_next,
+    }
+
+
+def _encode_json(data: Any) -> Optional[bytes]:
+    """
+    Serialize a request body to JSON bytes with orjson.
+
+    Returns None if orjson is not installed or cannot serialize the data, in which case
+    the HTTP library's own (stdlib) json encoding should be used instead.
+    """
+    if orjson is None or data is None:
+        return None
+    try:
+        # stdlib json converts int/float dict keys to strings, keep that behavior
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return None
+
+
+def _stream_items(response: requests.Response) -> Iterator[Dict]:
+    """
+    Lazily parse the items of a JSON array response while it is being downloaded.
+    """
+    response.raw.decode_content = True
+    try:
+        yield from ijson.items(response.raw, "item", use_float=True)
+    except ijson.JSONError as e:
+        raise RestClientException("Response does not contain valid json") from e
+    finally:
+        response.close()
+
+
+class _StreamedItems(Iterator[Dict]):
+    """
+    The items of a streamed response, holding on to the response so that close()
+    releases its connection even if iteration never started.
+    """
+
+    def __init__(self, response: requests.Response):
+        self._response = response
+        self._items = _stream_items(response)
+
+    def __next__(self) -> Dict:
+        return next(self._items)
+
+    def close(self) -> None:
+        self._items.close()
+        self._response.close()
 
 
 class BoardsOnFireClient:
@@ -24,6 +129,13 @@ class BoardsOnFireClient:
         domain (str): The domain of the BoardsOnFire instance.
         api_key (str): The API key for authentication.
         version (str, optional): The version of the API to use. Defaults to "v5".
+        logger (logging.Logger, optional): The logger to use. Defaults to the module logger.
+        rate_limit (Tuple[int, float], optional): Send at most this many requests per this many seconds,
+            e.g. (100, 60). Defaults to None (no client side limit).
+        max_retries (int, optional): How many times to retry a request that was rate limited
+            before raising RateLimitException. Defaults to 3.
+        transport (str, optional): The HTTP library to use, "requests" or "httpx". httpx speaks
+            HTTP/2 and needs the http2 extra. Defaults to "requests".
 
     Attributes:
         domain (str): The domain of the BoardsOnFire instance.
@@ -34,6 +146,9 @@ class BoardsOnFireClient:
         users (Users): An instance of the Users class for interacting with user-related endpoints.
         entities (Entities): An instance of the Entities class for interacting with entity-related endpoints.
         datasources (DataSources): An instance of the DataSources class for interacting with data source-related endpoints.
+
+    The client keeps a persistent HTTP session so connections are reused between requests.
+    Call close() when done, or use the client as a context manager.
     """
 
     def __init__(
@@ -42,69 +157,176 @@ class BoardsOnFireClient:
         api_key: str,
         version: str = "v5",
         logger: logging.Logger = None,
+        rate_limit: Tuple[int, float] = None,
+        max_retries: int = 3,
+        transport: Literal["requests", "httpx"] = "requests",
     ):
-
-        from .endpoints import Users, Organizations, Entities, DataSources
-
         self._logger = logger or logging.getLogger(__name__)
 
         self._domain = domain
         self._url = f"https://{domain}.boardsonfireapp.com/api/{version}/"
         self._api_key = api_key
         self._version = version
+        self._rate_limiter = RateLimiter(*rate_limit) if rate_limit else None
+        self._max_retries = max_retries
+        # monotonic time before which the server asked us not to send requests
+        self._resume_at = 0.0
+
+        self._transport = transport
+        if transport == "httpx":
+            if httpx is None:
+                raise ImportError(
+                    "httpx is required for transport='httpx', "
+                    "install boardsonfire-sdk[http2]"
+                )
+            self._session = httpx.Client(
+                http2=True,
+                headers={"x-api-key": api_key},
+                limits=httpx.Limits(max_keepalive_connections=10),
+                # httpx defaults to a 5 second timeout, requests waits indefinitely
+                timeout=None,
+                # requests follows redirects by default, httpx does not
+                follow_redirects=True,
+            )
+        elif transport == "requests":
+            self._session = requests.Session()
+            self._session.headers.update({"x-api-key": api_key})
+            self._session.mount(
+                "https://", HTTPAdapter(pool_connections=10, pool_maxsize=20)
+            )
+        else:
+            raise ValueError(f"Unknown transport: {transport}")
 
         self.organizations = Organizations(self)
         self.users = Users(self)
         self.entities = Entities(self)
         self.datasources = DataSources(self)
 
+    def __enter__(self) -> "BoardsOnFireClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying HTTP session and release its pooled connections.
+        """
+        self._session.close()
+
     def _send_request(
         self,
         method: str,
         endpoint: str,
         params: Dict = None,
         data: Dict = None,
-        headers: Dict = {},
-    ) -> Response:
+        headers: Dict = None,
+        stream: bool = False,
+        return_response: bool = True,
+    ) -> Optional[Response]:
         """
         Sends a request to the BoardsOnFire API.
 
+        Rate limited requests are retried up to max_retries times, waiting as long as the
+        server asks via its rate limit headers or backing off exponentially otherwise.
+        A response reporting no remaining requests delays the next request until the reset.
+
         Args:
             method (str): The HTTP method for the request.
             endpoint (str): The API endpoint to send the request to.
             params (Dict, optional): The query parameters for the request. Defaults to None.
             data (Dict, optional): The request body data. Defaults to None.
-            headers (Dict, optional): Additional headers for the request. Defaults to {}.
+            headers (Dict, optional): Additional headers for the request. Defaults to None.
+            stream (bool, optional): Parse a JSON array response incrementally, Response.data is then
+                an iterator over its items. Only takes effect with ijson installed and the requests
+                transport. Defaults to False.
+            return_response (bool, optional): Whether a successful DELETE returns a Response. Defaults to True.
 
         Returns:
-            Response: The response from the API.
+            Optional[Response]: The response from the API, None for a DELETE without return_response.
 
         Raises:
-            RateLimitException: If the rate limit is exceeded.
+            RateLimitException: If the rate limit is still exceeded after all retries.
             NotFoundException: If the requested resource is not found.
             RestClientException: If the response is not successful or does not contain valid JSON.
         """
 
         full_url = self._url + endpoint
-        base_header = {"x-api-key": self._api_key}
-        headers = base_header | headers
+        use_httpx = self._transport == "httpx"
+        stream = stream and ijson is not None and not use_httpx
+
+        body = _encode_json(data)
+        if body is not None:
+            payload = {"content" if use_httpx else "data": body}
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        else:
+            payload = {"json": data}
+
+        if use_httpx:
+            if params is not None:
+                # httpx sends None values as empty strings, requests drops them
+                params = {k: v for k, v in params.items() if v is not None}
+        else:
+            payload["stream"] = stream
+
+        for attempt in range(self._max_retries + 1):
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+
+            response = self._session.request(
+                method=method,
+                url=full_url,
+                headers=headers,
+                params=params,
+                **payload,
+            )
 
-        response = requests.request(
-            method=method, url=full_url, headers=headers, params=params, json=data
-        )
+            if response.status_code != 429 or attempt == self._max_retries:
+                break
+
+            response.close()
+            delay = retry_delay(response.headers, attempt)
+            self._logger.warning(f"Rate limit exceeded, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        if response.status_code < 400:
+            delay = exhausted_delay(response.headers)
+            if delay:
+                self._logger.info(
+                    f"No requests remaining, pausing the next request for {delay:.1f}s"
+                )
+                self._resume_at = time.monotonic() + delay
 
-        if response.ok:
             if method == "DELETE":
+                if not return_response:
+                    return None
                 return Response(
                     status_code=response.status_code, headers=response.headers
                 )
 
+            if stream:
+                return Response(
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    data=_StreamedItems(response),
+                    **_pagination(response.headers),
+                )
+
             try:
-                data = response.json()
+                if orjson is not None:
+                    data = orjson.loads(response.content)
+                else:
+                    data = response.json()
             except (ValueError, JSONDecodeError) as e:
                 raise RestClientException("Response does not contain valid json")
             return Response(
-                status_code=response.status_code, headers=response.headers, data=data
+                status_code=response.status_code,
+                headers=response.headers,
+                data=data,
+                **_pagination(response.headers),
             )
 
         if response.status_code == 429:
@@ -115,88 +337,47 @@ class BoardsOnFireClient:
             f"Bad response. \n Status Code: {response.status_code}\n  Message: {response.content}"
         )
 
-    def _get(self, endpoint: str, params: Dict = None, data: Dict = None) -> Response:
+    def _get(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        data: Dict = None,
+        stream: bool = False,
+    ) -> Response:
         """
-        Sends a GET request to the BoardsOnFire API.
-
-        Args:
-            endpoint (str): The API endpoint to send the request to.
-            params (Dict, optional): The query parameters for the request. Defaults to None.
-            data (Dict, optional): The request body data. Defaults to None.
-
-        Returns:
-            Response: The response from the API.
-
-        Raises:
-            RateLimitException: If the rate limit is exceeded.
-            NotFoundException: If the requested resource is not found.
-            RestClientException: If the response is not successful or does not contain valid JSON.
+        Sends a GET request to the BoardsOnFire API. See _send_request.
         """
-        return self._send_request(
-            method="GET", endpoint=endpoint, params=params, data=data
-        )
+        return self._send_request("GET", endpoint, params, data, stream=stream)
 
-    def _post(self, endpoint: str, params: Dict = None, data: Dict = None) -> Response:
+    def _post(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        data: Dict = None,
+        stream: bool = False,
+    ) -> Response:
         """
-        Sends a POST request to the BoardsOnFire API.
-
-        Args:
-            endpoint (str): The API endpoint to send the request to.
-            params (Dict, optional): The query parameters for the request. Defaults to None.
-            data (Dict, optional): The request body data. Defaults to None.
-
-        Returns:
-            Response: The response from the API.
-
-        Raises:
-            RateLimitException: If the rate limit is exceeded.
-            NotFoundException: If the requested resource is not found.
-            RestClientException: If the response is not successful or does not contain valid JSON.
+        Sends a POST request to the BoardsOnFire API. See _send_request.
         """
-        return self._send_request(
-            method="POST", endpoint=endpoint, params=params, data=data
-        )
+        return self._send_request("POST", endpoint, params, data, stream=stream)
 
     def _delete(
-        self, endpoint: str, params: Dict = None, data: Dict = None
-    ) -> Response:
+        self,
+        endpoint: str,
+        params: Dict = None,
+        data: Dict = None,
+        return_response: bool = False,
+    ) -> Optional[Response]:
         """
-        Sends a DELETE request to the BoardsOnFire API.
-
-        Args:
-            endpoint (str): The API endpoint to send the request to.
-            params (Dict, optional): The query parameters for the request. Defaults to None.
-            data (Dict, optional): The request body data. Defaults to None.
-
-        Returns:
-            Response: The response from the API.
-
-        Raises:
-            RateLimitException: If the rate limit is exceeded.
-            NotFoundException: If the requested resource is not found.
-            RestClientException: If the response is not successful or does not contain valid JSON.
+        Sends a DELETE request to the BoardsOnFire API, returning None unless
+        return_response is set. See _send_request.
         """
         return self._send_request(
-            method="DELETE", endpoint=endpoint, params=params, data=data
+            "DELETE", endpoint, params, data, return_response=return_response
         )
 
     def _patch(self, endpoint: str, params: Dict = None, data: Dict = None) -> Response:
         """
-        Sends a PATCH request to the BoardsOnFire API.
-
-        Args:
-            endpoint (str): The API endpoint to send the request to.
-            params (Dict, optional): The query parameters for the request. Defaults to None.
-            data (Dict, optional): The request body data. Defaults to None.
-
-        Returns:
-            Response: The response from the API.
-
-        Raises:
-            RateLimitException: If the rate limit is exceeded.
-            NotFoundException: If the requested resource is not found.
-            RestClientException: If the response is not successful or does not contain valid JSON.
+        Sends a PATCH request to the BoardsOnFire API. See _send_request.
         """
-        return self._send_request(
-            method="PATCH", endpoint=endpoint, params=params, data=data
-        )
+        return self._send_request("PATCH", endpoint, params, data)
@@ -1,9 +1,130 @@
-from typing import List, Dict, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, List, Dict, Iterator, Callable, Optional
 
-from .client import BoardsOnFireClient as RestClient
 from .exceptions import ValidationError
 
+if TYPE_CHECKING:
+    # client.py imports this module, so only import it for type checking
+    from .client import BoardsOnFireClient as RestClient, Response
+
 MAX_PAGE_SIZE = 500
+UPSERT_BATCH_SIZE = 500
+
+
+def _has_next_page(
+    response: "Response", page_size: int, yield_count: int, remaining: Optional[int]
+) -> bool:
+    """
+    Whether another page may follow the given one, judged before reading its records.
+
+    The length of a streamed page is unknown until it has been read, so those only
+    count as followed by another page when the headers say so.
+    """
+    if remaining is not None and remaining <= page_size:
+        return False
+    if isinstance(response.data, list):
+        if len(response.data) < page_size:
+            return False
+    elif not response.has_next and response.total is None:
+        return False
+    if response.has_next is False:
+        return False
+    if response.total is not None and yield_count + page_size >= response.total:
+        return False
+    return True
+
+
+def _paginate(
+    fetch: Callable[[Dict], "Response"], params: Dict, limit: int = None
+) -> Iterator[Dict]:
+    """
+    Iterate over a paginated endpoint, one page at a time.
+
+    While the records of a page are being yielded, the next page is already fetched
+    in a background thread. Streamed pages are only prefetched when the response
+    headers announce another page, otherwise the next page is fetched once the
+    current one turned out to be full. Stops after a short page, or earlier when the
+    response headers say there is no next page or the total count has been reached.
+    A prefetched page that ends up unused has its streamed response closed.
+
+    Args:
+        fetch (Callable[[Dict], Response]): Fetches the page described by params.
+            Response.data may be a list or a lazily parsed iterator.
+        params (Dict): The paging parameters of the first page.
+        limit (int, optional): The maximum number of records to yield. Defaults to None.
+
+    Yields:
+        Iterator[Dict]: An iterator over the records.
+    """
+    page_size = params["page_size"]
+    page = params["page"]
+    remaining = limit or None
+    yield_count = 0
+    executor = None
+    prefetch = None
+    response = fetch(params)
+    try:
+        while True:
+            if _has_next_page(response, page_size, yield_count, remaining):
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=1)
+                prefetch = executor.submit(fetch, {**params, "page": page + 1})
+
+            records = iter(response.data)
+            count = 0
+            for count, record in enumerate(islice(records, remaining), 1):
+                yield record
+            yield_count += count
+
+            if remaining is not None:
+                remaining -= count
+                if remaining <= 0:
+                    return
+
+            if count < page_size or response.has_next is False:
+                return
+            if response.total is not None and yield_count >= response.total:
+                return
+
+            if prefetch is None:
+                response = fetch({**params, "page": page + 1})
+            else:
+                response, prefetch = prefetch.result(), None
+            page += 1
+    finally:
+        # release a streamed response we stopped reading midway
+        _close_data(response)
+        if prefetch is not None and not prefetch.cancel():
+            prefetch.add_done_callback(_release)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _release(prefetch: "Future[Response]") -> None:
+    """
+    Close the streamed response of a prefetched page that will not be read.
+    """
+    if prefetch.exception() is None:
+        _close_data(prefetch.result())
+
+
+def _close_data(response: "Response") -> None:
+    getattr(response.data, "close", lambda: None)()
+
+
+def _batches(data: List[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    """
+    Split data into consecutive slices of at most batch_size rows.
+
+    Data that fits in one batch is yielded as is, not copied.
+    """
+    if not batch_size or len(data) <= batch_size:
+        yield data
+        return
+
+    for i in range(0, len(data), batch_size):
+        yield data[i : i + batch_size]
 
 
 class ValidateEntity:
@@ -18,7 +139,7 @@ class ValidateEntity:
         Raises:
             ValidationError: If the required fields are missing.
         """
-        if not {"organization_id"} <= set(data):
+        if "organization_id" not in data:
             raise ValidationError(
                 "organization_id is required to create an entity object"
             )
@@ -37,10 +158,11 @@ class ValidateEntity:
         if not isinstance(data, list):
             raise ValidationError("Data must be a list of dictionaries")
 
-        if not all({"organization_id"} <= set(row) for row in data):
-            raise ValidationError(
-                "organization_id is required to create an entity object"
-            )
+        for row in data:
+            if "organization_id" not in row:
+                raise ValidationError(
+                    "organization_id is required to create an entity object"
+                )
 
 
 class ValidateDataSource:
@@ -55,7 +177,7 @@ class ValidateDataSource:
         Raises:
             ValidationError: If the required fields are missing.
         """
-        if not {"organization_id", "timestamp"} <= set(data):
+        if "organization_id" not in data or "timestamp" not in data:
             raise ValidationError(
                 "organization_id and timestamp is required to create a datasource object"
             )
@@ -74,10 +196,11 @@ class ValidateDataSource:
         if not isinstance(data, list):
             raise ValidationError("Data must be a list of dictionaries")
 
-        if not all({"organization_id", "timestamp"} <= set(row) for row in data):
-            raise ValidationError(
-                "organization_id and timestamp is required to create a datasource object"
-            )
+        for row in data:
+            if "organization_id" not in row or "timestamp" not in row:
+                raise ValidationError(
+                    "organization_id and timestamp is required to create a datasource object"
+                )
 
 
 class Organizations:
@@ -85,7 +208,7 @@ class Organizations:
     Represents a collection of methods for interacting with organizations.
     """
 
-    def __init__(self, rest_client: RestClient):
+    def __init__(self, rest_client: "RestClient"):
         self.rest_client = rest_client
 
     def list(
@@ -126,7 +249,11 @@ class Organizations:
         return response.data
 
     def list_all(
-        self, limit: int = None, order_by: str = None, direction: str = "ASC"
+        self,
+        limit: int = None,
+        order_by: str = None,
+        direction: str = "ASC",
+        stream: bool = False,
     ) -> Iterator[Dict]:
         """
         List all organizations.
@@ -135,6 +262,8 @@ class Organizations:
             limit (int, optional): The maximum number of organizations to retrieve. Defaults to None.
             order_by (str, optional): The field to order the organizations by. Defaults to None.
             direction (str, optional): The direction of the ordering (ASC or DESC). Defaults to ASC.
+            stream (bool, optional): Parse each page incrementally while it downloads, keeping memory
+                flat on large pages at some CPU cost. Needs ijson and the requests transport. Defaults to False.
 
         Yields:
             Iterator[Dict]: An iterator over the organizations.
@@ -145,23 +274,13 @@ class Organizations:
             "order": order_by,
             "direction": direction,
         }
-        yield_count = 0
-        trigger = True
-        while trigger:
-            response = self.rest_client._get("organizations", params=params)
-
-            for record in response.data:
-                yield_count += 1
-                yield record
-
-                if limit and yield_count >= limit:
-                    trigger = False
-                    break
-
-            if not response.data or len(response.data) < params["page_size"]:
-                break
-
-            params["page"] += 1
+        yield from _paginate(
+            lambda params: self.rest_client._get(
+                "organizations", params=params, stream=stream
+            ),
+            params,
+            limit,
+        )
 
     def get(self, id: str) -> Dict:
         """
@@ -182,7 +301,7 @@ class Users:
     Represents a collection of methods for interacting with users.
     """
 
-    def __init__(self, rest_client: RestClient):
+    def __init__(self, rest_client: "RestClient"):
         self.rest_client = rest_client
 
     def list(
@@ -223,7 +342,11 @@ class Users:
         return response.data
 
     def list_all(
-        self, limit: int = None, order_by: str = None, direction: str = "ASC"
+        self,
+        limit: int = None,
+        order_by: str = None,
+        direction: str = "ASC",
+        stream: bool = False,
     ) -> Iterator[Dict]:
         """
         List all users.
@@ -232,6 +355,8 @@ class Users:
             limit (int, optional): The maximum number of users to retrieve. Defaults to None.
             order_by (str, optional): The field to order the users by. Defaults to None.
             direction (str, optional): The direction of the ordering (ASC or DESC). Defaults to ASC.
+            stream (bool, optional): Parse each page incrementally while it downloads, keeping memory
+                flat on large pages at some CPU cost. Needs ijson and the requests transport. Defaults to False.
 
         Yields:
             Iterator[Dict]: An iterator over the users.
@@ -242,23 +367,11 @@ class Users:
             "order": order_by,
             "direction": direction,
         }
-        yield_count = 0
-        trigger = True
-        while trigger:
-            response = self.rest_client._get("users", params=params)
-
-            for record in response.data:
-                yield_count += 1
-                yield record
-
-                if limit and yield_count >= limit:
-                    trigger = False
-                    break
-
-            if not response.data or len(response.data) < params["page_size"]:
-                break
-
-            params["page"] += 1
+        yield from _paginate(
+            lambda params: self.rest_client._get("users", params=params, stream=stream),
+            params,
+            limit,
+        )
 
     def get(self, id: str) -> Dict:
         """
@@ -279,13 +392,13 @@ class Entities:
     Represents a collection of methods for interacting with entites.
     """
 
-    def __init__(self, rest_client: RestClient):
+    def __init__(self, rest_client: "RestClient"):
         self.rest_client = rest_client
 
     def list(
         self,
         entity_name: str,
-        organizations: List[str] = [],
+        organizations: Optional[List[str]] = None,
         page_size: int = 100,
         page: int = 1,
         order: str = None,
@@ -297,7 +410,7 @@ class Entities:
 
         Args:
             entity_name (str): The name of the entity.
-            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to [].
+            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to None.
             page_size (int, optional): The number of entity objects to retrieve per page. Defaults to 100.
             page (int, optional): The page number to retrieve. Defaults to 1.
             order (str, optional): The field to order the entity objects by. Defaults to None.
@@ -322,8 +435,9 @@ class Entities:
             "order": order,
             "group": group,
             "filter": filter,
-            "target_organization_ids": ",".join(organizations),
         }
+        if organizations:
+            params["target_organization_ids"] = ",".join(organizations)
         response = self.rest_client._post(
             f"entities/{entity_name}/entityobjects/list", params=params
         )
@@ -333,10 +447,11 @@ class Entities:
         self,
         entity_name: str,
         limit: int = None,
-        organizations: List[str] = [],
+        organizations: Optional[List[str]] = None,
         order: str = None,
         group: str = None,
         filter: str = None,
+        stream: bool = False,
     ) -> Iterator[Dict]:
         """
         List all entity objects.
@@ -344,10 +459,12 @@ class Entities:
         Args:
             entity_name (str): The name of the entity.
             limit (int, optional): The maximum number of entity objects to retrieve. Defaults to None.
-            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to [].
+            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to None.
             order (str, optional): The field to order the entity objects by. Defaults to None.
             group (str, optional): Filter the data using group. Defaults to None.
             filter (str, optional): The filter to apply to the entity objects. Defaults to None.
+            stream (bool, optional): Parse each page incrementally while it downloads, keeping memory
+                flat on large pages at some CPU cost. Needs ijson and the requests transport. Defaults to False.
 
         Yields:
             Iterator[Dict]: An iterator over the entity objects.
@@ -358,27 +475,17 @@ class Entities:
             "order": order,
             "group": group,
             "filter": filter,
-            "target_organization_ids": ",".join(organizations),
         }
-        yield_count = 0
-        over_limit = False
-        while not over_limit:
-            response = self.rest_client._post(
-                f"entities/{entity_name}/entityobjects/list", params=params
-            )
-
-            for record in response.data:
-                yield_count += 1
-                yield record
-
-                if limit and yield_count >= limit:
-                    over_limit = True
-                    break
-
-            if not response.data or len(response.data) < params["page_size"]:
-                break
-
-            params["page"] += 1
+        if organizations:
+            params["target_organization_ids"] = ",".join(organizations)
+        endpoint = f"entities/{entity_name}/entityobjects/list"
+        yield from _paginate(
+            lambda params: self.rest_client._post(
+                endpoint, params=params, stream=stream
+            ),
+            params,
+            limit,
+        )
 
     def get(self, entity_name: str, id: str) -> Dict:
         """
@@ -430,26 +537,47 @@ class Entities:
         return response.data
 
     def upsert(
-        self, entity_name: str, data: List[Dict], truncate: bool = False
+        self,
+        entity_name: str,
+        data: List[Dict],
+        truncate: bool = False,
+        batch_size: int = UPSERT_BATCH_SIZE,
     ) -> List[str]:
         """
         Upsert entity objects.
 
+        Large uploads are sent in batches of batch_size objects. When truncate is set the
+        data is always sent in a single request, since each batch would otherwise delete
+        the objects imported by the batches before it.
+
+        Batches are not atomic: if one fails, the batches before it stay imported and the
+        raised exception carries none of their IDs. Pass batch_size=None to send the data
+        in a single request.
+
         Args:
             entity_name (str): The name of the entity.
             data (List[Dict]): The data for the entity objects.
             truncate (bool, optional): Whether to delete other entity objects not included in the data. Defaults to False.
+            batch_size (int, optional): The maximum number of objects per request. Defaults to 500.
 
         Returns:
-            List[str]: The IDs of the upserted entity objects.
+            List[str]: The IDs of the upserted entity objects. For a single batch, the response data as is.
         """
         ValidateEntity.upsert(data)
 
-        body = {"entity_objects": data, "delete_others": truncate}
-        response = self.rest_client._post(
-            f"entities/{entity_name}/entityobjects/import", data=body
-        )
-        return response.data
+        endpoint = f"entities/{entity_name}/entityobjects/import"
+        if truncate:
+            batch_size = None
+
+        ids = []
+        for batch in _batches(data, batch_size):
+            body = {"entity_objects": batch, "delete_others": truncate}
+            response = self.rest_client._post(endpoint, data=body)
+            if batch is data:
+                # a single batch, return the response as the API sent it
+                return response.data
+            ids.extend(response.data)
+        return ids
 
     def delete(self, entity_name: str, id: str) -> None:
         """
@@ -467,13 +595,13 @@ class DataSources:
     Represents a collection of methods for interacting with data sources.
     """
 
-    def __init__(self, rest_client: RestClient):
+    def __init__(self, rest_client: "RestClient"):
         self.rest_client = rest_client
 
     def list(
         self,
         datasource_name: str,
-        organizations: List[str] = [],
+        organizations: Optional[List[str]] = None,
         page_size: int = 100,
         page: int = 1,
         order: str = None,
@@ -485,7 +613,7 @@ class DataSources:
 
         Args:
             datasource_name (str): The name of the datasource.
-            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to [].
+            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to None.
             page_size (int, optional): The number of data objects to retrieve per page. Defaults to 100.
             page (int, optional): The page number to retrieve. Defaults to 1.
             order (str, optional): The field to order the data objects by  i.e. (columnName asc). Defaults to None.
@@ -510,8 +638,9 @@ class DataSources:
             "order": order,
             "group": group,
             "filter": filter,
-            "target_organization_ids": ",".join(organizations),
         }
+        if organizations:
+            body["target_organization_ids"] = ",".join(organizations)
         response = self.rest_client._post(
             f"datasources/{datasource_name}/dataobjects/list", data=body
         )
@@ -521,10 +650,11 @@ class DataSources:
         self,
         datasource_name: str,
         limit: int = None,
-        organizations: List[str] = [],
+        organizations: Optional[List[str]] = None,
         order: str = None,
         group: str = None,
         filter: str = None,
+        stream: bool = False,
     ) -> Iterator[Dict]:
         """
         List all data objects from a datasource.
@@ -532,10 +662,12 @@ class DataSources:
         Args:
             datasource_name (str): The name of the datasource.
             limit (int, optional): The maximum number of data objects to retrieve. Defaults to None.
-            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to [].
+            organizations (List[str], optional): The list of organization IDs to filter by. Defaults to None.
             order (str, optional): The field to order the data objects by  i.e. (columnName asc). Defaults to None.
             group (str, optional): Filter the data using group. Defaults to None.
             filter (str, optional): The filter to apply to the data objects i.e. (columnName asc). Defaults to None.
+            stream (bool, optional): Parse each page incrementally while it downloads, keeping memory
+                flat on large pages at some CPU cost. Needs ijson and the requests transport. Defaults to False.
 
         Yields:
             Iterator[Dict]: An iterator over the data objects.
@@ -546,27 +678,15 @@ class DataSources:
             "order": order,
             "group": group,
             "filter": filter,
-            "target_organization_ids": ",".join(organizations),
         }
-        yield_count = 0
-        over_limit = False
-        while not over_limit:
-            response = self.rest_client._post(
-                f"datasources/{datasource_name}/dataobjects/list", data=body
-            )
-
-            for record in response.data:
-                yield_count += 1
-                yield record
-
-                if limit and yield_count >= limit:
-                    over_limit = True
-                    break
-
-            if not response.data or len(response.data) < body["page_size"]:
-                break
-
-            body["page"] += 1
+        if organizations:
+            body["target_organization_ids"] = ",".join(organizations)
+        endpoint = f"datasources/{datasource_name}/dataobjects/list"
+        yield from _paginate(
+            lambda body: self.rest_client._post(endpoint, data=body, stream=stream),
+            body,
+            limit,
+        )
 
     def get(self, datasource_name: str, id: str) -> Dict:
         """
@@ -619,23 +739,38 @@ class DataSources:
         )
         return response.data
 
-    def upsert(self, datasource_name: str, data: List[Dict]) -> List[str]:
+    def upsert(
+        self,
+        datasource_name: str,
+        data: List[Dict],
+        batch_size: int = UPSERT_BATCH_SIZE,
+    ) -> List[str]:
         """
         Upsert (insert or update) multiple data objects in a datasource.
 
+        Large uploads are sent in batches of batch_size objects. Batches are not atomic:
+        if one fails, the batches before it stay imported and the raised exception carries
+        none of their IDs. Pass batch_size=None to send the data in a single request.
+
         Args:
             datasource_name (str): The name of the datasource.
             data (List[Dict]): The data objects to upsert.
+            batch_size (int, optional): The maximum number of objects per request. Defaults to 500.
 
         Returns:
-            List[str]: The IDs of the upserted data objects.
+            List[str]: The IDs of the upserted data objects. For a single batch, the response data as is.
         """
         ValidateDataSource.upsert(data)
 
-        response = self.rest_client._post(
-            f"datasources/{datasource_name}/dataobjects/import", data=data
-        )
-        return response.data
+        endpoint = f"datasources/{datasource_name}/dataobjects/import"
+        ids = []
+        for batch in _batches(data, batch_size):
+            response = self.rest_client._post(endpoint, data=batch)
+            if batch is data:
+                # a single batch, return the response as the API sent it
+                return response.data
+            ids.extend(response.data)
+        return ids
 
     def delete(self, datasource_name: str, id: str) -> None:
         """
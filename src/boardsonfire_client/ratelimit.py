@@ -0,0 +1,124 @@
+import asyncio
+import random
+import threading
+import time
+
+from typing import Mapping, Optional
+
+
+class RateLimiter:
+    """
+    A token bucket limiting requests to `max_rate` per `time_period` seconds.
+
+    Tokens are reserved in order, so concurrent callers are spread out over time
+    instead of all waking up at once. Safe to share between threads.
+
+    Args:
+        max_rate (int): The number of requests allowed per time period.
+        time_period (float): The length of the time period in seconds.
+    """
+
+    def __init__(self, max_rate: int, time_period: float):
+        self._max_rate = max_rate
+        self._rate = max_rate / time_period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Reserve a token and return the number of seconds to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._max_rate, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self) -> None:
+        """
+        Block until a request may be sent.
+        """
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def async_acquire(self) -> None:
+        """
+        Wait until a request may be sent without blocking the event loop.
+        """
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _header_seconds(headers: Mapping, name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def seconds_until_reset(headers: Mapping) -> Optional[float]:
+    """
+    Read how long the server asks us to wait from the rate limit headers.
+
+    Uses Retry-After if present, otherwise X-RateLimit-Reset, which may be given
+    either as seconds or as a unix timestamp.
+
+    Args:
+        headers (Mapping): The response headers.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if the headers don't say.
+    """
+    retry_after = _header_seconds(headers, "Retry-After")
+    if retry_after is not None:
+        return max(retry_after, 0.0)
+
+    reset = _header_seconds(headers, "X-RateLimit-Reset")
+    if reset is None:
+        return None
+    if reset > 1_000_000_000:
+        # a unix timestamp rather than a number of seconds
+        reset -= time.time()
+    return max(reset, 0.0)
+
+
+def retry_delay(headers: Mapping, attempt: int) -> float:
+    """
+    The number of seconds to wait before retrying a rate limited request.
+
+    Honors the server's rate limit headers, falling back to exponential backoff with jitter.
+
+    Args:
+        headers (Mapping): The headers of the rate limited response.
+        attempt (int): The zero-based number of the attempt that was rate limited.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    delay = seconds_until_reset(headers)
+    if delay is None:
+        delay = 2**attempt + random.random()
+    return delay
+
+
+def exhausted_delay(headers: Mapping) -> float:
+    """
+    The number of seconds to wait when the server reports no remaining requests.
+
+    Args:
+        headers (Mapping): The headers of a successful response.
+
+    Returns:
+        float: The number of seconds to wait, 0 if requests remain.
+    """
+    if _header_seconds(headers, "X-RateLimit-Remaining") != 0:
+        return 0.0
+    return seconds_until_reset(headers) or 0.0
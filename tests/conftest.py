@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.boardsonfire_client.endpoints import (
+    Organizations,
+    Users,
+    Entities,
+    DataSources,
+)
+
+
+@pytest.fixture(scope="module")
+def _rest_client():
+    return MagicMock()
+
+
+@pytest.fixture
+def rest_client(_rest_client):
+    _rest_client.reset_mock(return_value=True, side_effect=True)
+    return _rest_client
+
+
+@pytest.fixture
+def organizations(rest_client):
+    return Organizations(rest_client)
+
+
+@pytest.fixture
+def users(rest_client):
+    return Users(rest_client)
+
+
+@pytest.fixture
+def entities(rest_client):
+    return Entities(rest_client)
+
+
+@pytest.fixture
+def datasources(rest_client):
+    return DataSources(rest_client)
@@ -1,15 +1,36 @@
+import io
+import json
+import threading
 import unittest
-from unittest.mock import patch, Mock
-from unittest.mock import MagicMock
-
-from src.boardsonfire_client.client import BoardsOnFireClient, Response
+from types import SimpleNamespace
+from unittest.mock import call, patch, Mock
+from unittest.mock import MagicMock, AsyncMock
+
+import pytest
+
+from src.boardsonfire_client.client import (
+    BoardsOnFireClient,
+    Response,
+    orjson,
+    ijson,
+    httpx,
+    _encode_json,
+    _pagination,
+)
 from src.boardsonfire_client.endpoints import (
-    Organizations,
-    Users,
-    Entities,
-    DataSources,
     ValidateEntity,
     ValidateDataSource,
+    _paginate,
+)
+
+try:
+    from src.boardsonfire_client import async_client
+except ImportError:
+    async_client = None
+from src.boardsonfire_client.ratelimit import (
+    RateLimiter,
+    retry_delay,
+    exhausted_delay,
 )
 from src.boardsonfire_client.exceptions import (
     RateLimitException,
@@ -18,56 +39,242 @@ from src.boardsonfire_client.exceptions import (
     ValidationError,
 )
 
+_ENTITY_CREATE_DATA = {
+    "name": "Example",
+    "description": "This is an example entity",
+    "value": 100,
+    "organization_id": "123456",
+}
+_ENTITY_CREATE_NO_ORG = {
+    k: v for k, v in _ENTITY_CREATE_DATA.items() if k != "organization_id"
+}
+_ENTITY_CREATE_RESPONSE = {"id": "123456", **_ENTITY_CREATE_NO_ORG}
+
+_DATASOURCE_CREATE_DATA = {
+    "name": "Example",
+    "description": "This is an example datasource",
+    "value": 100,
+    "organization_id": "123456",
+    "timestamp": "2022-01-01T00:00:00Z",
+}
+_DATASOURCE_CREATE_NO_ORG = {
+    k: v
+    for k, v in _DATASOURCE_CREATE_DATA.items()
+    if k not in ("organization_id", "timestamp")
+}
+_DATASOURCE_CREATE_RESPONSE = {"id": "123456", **_DATASOURCE_CREATE_NO_ORG}
+
+_ORG_ONLY_ROW = {"organization_id": "123"}
+_DATASOURCE_ROW = {"organization_id": "123", "timestamp": "2022-01-01T00:00:00Z"}
+
+
+_DEFAULT_LIST_PARAMS_50 = {
+    "page_size": 50,
+    "page": 1,
+    "order": None,
+    "direction": "ASC",
+}
+_DEFAULT_LIST_PARAMS_100 = {**_DEFAULT_LIST_PARAMS_50, "page_size": 100}
+_DEFAULT_ENTITY_LIST_PARAMS = {
+    "page_size": 100,
+    "page": 1,
+    "order": None,
+    "group": None,
+    "filter": None,
+}
+
+_FULL_PAGE = [{"id": str(i)} for i in range(100)]
+
+
+def _two_pages():
+    return [Response(200, {}, data=_FULL_PAGE), Response(200, {}, data=[])]
+
+
+def _resp(ok, status, json_data=None):
+    response = SimpleNamespace(
+        ok=ok,
+        status_code=status,
+        headers={},
+        content=json.dumps(json_data).encode(),
+        close=lambda: None,
+    )
+    response.json = lambda: json.loads(response.content)
+    return response
+
 
 class TestBoardsOnFireClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._patcher = patch("requests.Session.request")
+        cls.mock_request = cls._patcher.start()
+        cls.addClassCleanup(cls._patcher.stop)
 
     def setUp(self):
+        self.mock_request.reset_mock(return_value=True, side_effect=True)
         self.client = BoardsOnFireClient("example.com", "api_key")
 
-    @patch("requests.request")
-    def test_send_request_success(self, mock_request):
-        mock_response = Mock()
-        mock_response.ok = True
-        mock_response.json.return_value = {"data": "test"}
-        mock_response.status_code = 200
-        mock_request.return_value = mock_response
+    @patch("time.sleep")
+    def test_send_request_status_matrix(self, mock_sleep):
+        cases = [
+            (200, None, {"data": "test"}, 1),
+            (429, RateLimitException, None, 4),
+            (404, NotFoundException, None, 1),
+            (400, RestClientException, None, 1),
+        ]
+        for status, exc, data, calls in cases:
+            with self.subTest(status=status):
+                self.mock_request.reset_mock()
+                self.mock_request.return_value = _resp(status < 400, status, data)
+
+                if exc is None:
+                    response = self.client._send_request("GET", "endpoint")
+                    self.assertEqual(response.data, data)
+                else:
+                    with self.assertRaises(exc):
+                        self.client._send_request("GET", "endpoint")
+                self.assertEqual(self.mock_request.call_count, calls)
+
+    @patch("time.sleep")
+    def test_send_request_rate_limit_retry(self, mock_sleep):
+        self.mock_request.side_effect = [
+            _resp(False, 429),
+            _resp(True, 200, {"data": "test"}),
+        ]
 
         response = self.client._send_request("GET", "endpoint")
         self.assertEqual(response.data, {"data": "test"})
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @patch("time.sleep")
+    def test_send_request_pauses_next_request_when_exhausted(self, mock_sleep):
+        mock_response = _resp(True, 200, [])
+        mock_response.headers = {
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": "7",
+        }
+        self.mock_request.return_value = mock_response
 
-    @patch("requests.request")
-    def test_send_request_rate_limit(self, mock_request):
-        mock_response = Mock()
-        mock_response.ok = False
-        mock_response.status_code = 429
-        mock_request.return_value = mock_response
+        self.client._send_request("GET", "endpoint")
+        mock_sleep.assert_not_called()
 
-        with self.assertRaises(RateLimitException):
-            self.client._send_request("GET", "endpoint")
+        self.client._send_request("GET", "endpoint")
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], 7, delta=0.5)
 
-    @patch("requests.request")
-    def test_send_request_not_found(self, mock_request):
-        mock_response = Mock()
-        mock_response.ok = False
-        mock_response.status_code = 404
-        mock_request.return_value = mock_response
+    def test_send_request_invalid_json(self):
+        mock_response = _resp(True, 200)
+        mock_response.content = b"not json"
+        self.mock_request.return_value = mock_response
 
-        with self.assertRaises(NotFoundException):
+        with self.assertRaises(RestClientException):
             self.client._send_request("GET", "endpoint")
 
-    @patch("requests.request")
-    def test_send_request_bad_response(self, mock_request):
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_send_request_serializes_body_with_orjson(self):
+        self.mock_request.return_value = _resp(True, 200, [])
+
+        self.client._send_request("POST", "endpoint", data={"key": "value"})
+
+        kwargs = self.mock_request.call_args.kwargs
+        self.assertEqual(orjson.loads(kwargs["data"]), {"key": "value"})
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+        self.assertNotIn("json", kwargs)
+
+    @unittest.skipIf(ijson is None, "ijson is not installed")
+    def test_send_request_stream(self):
+        mock_response = _resp(True, 200)
+        mock_response.raw = io.BytesIO(b'[{"id": "1", "value": 1.5}, {"id": "2"}]')
+        mock_response.close = Mock()
+        self.mock_request.return_value = mock_response
+
+        response = self.client._send_request("GET", "endpoint", stream=True)
+
+        self.assertTrue(self.mock_request.call_args.kwargs["stream"])
+        self.assertEqual(list(response.data), [{"id": "1", "value": 1.5}, {"id": "2"}])
+        mock_response.close.assert_called_once()
+
+    @unittest.skipIf(ijson is None, "ijson is not installed")
+    def test_send_request_stream_close_before_reading(self):
+        mock_response = _resp(True, 200)
+        mock_response.raw = io.BytesIO(b"[]")
+        mock_response.close = Mock()
+        self.mock_request.return_value = mock_response
+
+        self.client._send_request("GET", "endpoint", stream=True).data.close()
+
+        mock_response.close.assert_called()
+
+    def test_send_request_delete_without_response(self):
+        self.mock_request.return_value = _resp(True, 204)
+
+        self.assertIsNone(self.client._delete("endpoint"))
+        self.assertIsInstance(
+            self.client._delete("endpoint", return_response=True), Response
+        )
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    @patch("httpx.Client.request")
+    def test_send_request_httpx(self, mock_request):
         mock_response = Mock()
-        mock_response.ok = False
-        mock_response.status_code = 400
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_response.json.return_value = {"data": "test"}
+        mock_response.content = b'{"data": "test"}'
         mock_request.return_value = mock_response
+        client = BoardsOnFireClient("example.com", "api_key", transport="httpx")
 
-        with self.assertRaises(RestClientException):
-            self.client._send_request("GET", "endpoint")
+        response = client._send_request(
+            "POST", "endpoint", params={"page": 1, "order": None}, data={"key": "value"}
+        )
 
-    def test_get_request(self):
-        self.client._send_request = MagicMock(return_value=Response(200, {}))
+        self.assertEqual(response.data, {"data": "test"})
+        kwargs = mock_request.call_args.kwargs
+        self.assertEqual(kwargs["params"], {"page": 1})
+        self.assertNotIn("stream", kwargs)
+        self.assertEqual(client._session.headers["x-api-key"], "api_key")
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_httpx_has_no_timeout(self):
+        client = BoardsOnFireClient("example.com", "api_key", transport="httpx")
+        self.assertEqual(client._session.timeout, httpx.Timeout(None))
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_httpx_follows_redirects(self):
+        client = BoardsOnFireClient("example.com", "api_key", transport="httpx")
+        self.assertTrue(client._session.follow_redirects)
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ValueError):
+            BoardsOnFireClient("example.com", "api_key", transport="urllib")
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_encode_json(self):
+        self.assertEqual(_encode_json({1: "a"}), b'{"1":"a"}')
+        self.assertIsNone(_encode_json(None))
+        self.assertIsNone(_encode_json({"value": object()}))
+
+    def test_session_sends_api_key(self):
+        self.assertEqual(self.client._session.headers["x-api-key"], "api_key")
+
+    def test_context_manager_closes_session(self):
+        with BoardsOnFireClient("example.com", "api_key") as client:
+            client._session.close = MagicMock()
+        client._session.close.assert_called_once()
+
+
+class TestBoardsOnFireClientWrappers(unittest.TestCase):
+    # the wrappers only forward to _send_request, so skip building a session
+    @classmethod
+    def setUpClass(cls):
+        cls._client = BoardsOnFireClient.__new__(BoardsOnFireClient)
+        cls._client._send_request = MagicMock()
 
+    def setUp(self):
+        self.client = self._client
+        self.client._send_request.reset_mock(return_value=True)
+        self.client._send_request.return_value = Response(200, {})
+
+    def test_get_request(self):
         response = self.client._get("endpoint")
 
         self.assertEqual(response.status_code, 200)
@@ -75,8 +282,6 @@ class TestBoardsOnFireClient(unittest.TestCase):
         self.assertIsNone(response.data)
 
     def test_post_request(self):
-        self.client._send_request = MagicMock(return_value=Response(200, {}))
-
         response = self.client._post("endpoint", data={"key": "value"})
 
         self.assertEqual(response.status_code, 200)
@@ -84,16 +289,12 @@ class TestBoardsOnFireClient(unittest.TestCase):
         self.assertIsNone(response.data)
 
     def test_delete_request(self):
-        self.client._send_request = MagicMock(return_value=Response(200, {}))
-
-        response = self.client._delete("endpoint")
+        response = self.client._delete("endpoint", return_response=True)
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.headers, {})
 
     def test_patch_request(self):
-        self.client._send_request = MagicMock(return_value=Response(200, {}))
-
         response = self.client._patch("endpoint", data={"key": "value"})
 
         self.assertEqual(response.status_code, 200)
@@ -101,7 +302,7 @@ class TestBoardsOnFireClient(unittest.TestCase):
         self.assertIsNone(response.data)
 
     def test_rate_limit_exceeded(self):
-        self.client._send_request = MagicMock(return_value=Response(429, {}))
+        self.client._send_request.return_value = Response(429, {})
 
         response = self.client._get("endpoint")
 
@@ -109,313 +310,608 @@ class TestBoardsOnFireClient(unittest.TestCase):
         self.assertEqual(response.headers, {})
 
 
-class TestOrganizations(unittest.TestCase):
-    def setUp(self):
-        self.rest_client = MagicMock()
-        self.organizations = Organizations(self.rest_client)
+class TestRateLimiter(unittest.TestCase):
+    def test_reserve(self):
+        limiter = RateLimiter(2, 1)
+        self.assertEqual(limiter._reserve(), 0)
+        self.assertEqual(limiter._reserve(), 0)
+        self.assertAlmostEqual(limiter._reserve(), 0.5, places=2)
 
-    def test_list(self):
-        self.rest_client._get.return_value = MagicMock(
-            data=[{"id": "1", "name": "Org1"}, {"id": "2", "name": "Org2"}]
-        )
-        result = self.organizations.list()
-        self.rest_client._get.assert_called_with(
-            "organizations",
-            params={"page_size": 50, "page": 1, "order": None, "direction": "ASC"},
-        )
-        self.assertEqual(
-            result, [{"id": "1", "name": "Org1"}, {"id": "2", "name": "Org2"}]
-        )
+    def test_retry_delay(self):
+        self.assertEqual(retry_delay({"Retry-After": "3"}, 0), 3)
+        self.assertGreaterEqual(retry_delay({}, 2), 4)
 
-    def test_list_all(self):
-        self.rest_client._get.return_value = MagicMock(
-            data=[{"id": "1", "name": "Org1"}, {"id": "2", "name": "Org2"}]
-        )
-        result = list(self.organizations.list_all(limit=100))
-        self.rest_client._get.assert_called_with(
-            "organizations",
-            params={"page_size": 100, "page": 1, "order": None, "direction": "ASC"},
-        )
+    def test_exhausted_delay(self):
+        self.assertEqual(exhausted_delay({"X-RateLimit-Remaining": "5"}), 0)
         self.assertEqual(
-            result, [{"id": "1", "name": "Org1"}, {"id": "2", "name": "Org2"}]
+            exhausted_delay({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7"}),
+            7,
         )
 
-    def test_get(self):
-        self.rest_client._get.return_value = MagicMock(data={"id": "1", "name": "Org1"})
-        result = self.organizations.get("1")
-        self.rest_client._get.assert_called_with("organizations/1")
-        self.assertEqual(result, {"id": "1", "name": "Org1"})
 
+class _Stream:
+    """
+    Stands in for a streamed Response.data, an iterator that can be closed.
+    """
 
-class TestUsers(unittest.TestCase):
-    def setUp(self):
-        self.rest_client = MagicMock()
-        self.users = Users(self.rest_client)
-
-    def test_list(self):
-        self.rest_client._get.return_value.data = [{"id": "1", "name": "Test User"}]
-        response = self.users.list()
-        self.assertEqual(response, [{"id": "1", "name": "Test User"}])
-        self.rest_client._get.assert_called_once_with(
-            "users",
-            params={
-                "page_size": 100,
-                "page": 1,
-                "order": None,
-                "direction": "ASC",
-            },
-        )
+    def __init__(self, records):
+        self._records = iter(records)
+        self.closed = threading.Event()
 
-    def test_list_all(self):
-        self.rest_client._get.return_value.data = [{"id": "1", "name": "Test User"}]
-        response = list(self.users.list_all())
-        self.assertEqual(response, [{"id": "1", "name": "Test User"}])
-        self.rest_client._get.assert_called_once_with(
-            "users",
-            params={
-                "page_size": 100,
-                "page": 1,
-                "order": None,
-                "direction": "ASC",
-            },
-        )
+    def __iter__(self):
+        return self
 
-    def test_get(self):
-        self.rest_client._get.return_value.data = {"id": "1", "name": "Test User"}
-        response = self.users.get("1")
-        self.assertEqual(response, {"id": "1", "name": "Test User"})
-        self.rest_client._get.assert_called_once_with("users/1")
+    def __next__(self):
+        return next(self._records)
 
+    def close(self):
+        self.closed.set()
 
-class TestEntities(unittest.TestCase):
-    def setUp(self):
-        self.rest_client = MagicMock()
-        self.entities = Entities(self.rest_client)
-        self.entity_name = "test_entity"
-
-    def test_list(self):
-        self.rest_client._post.return_value.data = [{"id": "1", "name": "Test Entity"}]
-        response = self.entities.list(entity_name=self.entity_name)
-        self.assertEqual(response, [{"id": "1", "name": "Test Entity"}])
-        self.rest_client._post.assert_called_once_with(
-            f"entities/{self.entity_name}/entityobjects/list",
-            params={
-                "page_size": 100,
-                "page": 1,
-                "order": None,
-                "group": None,
-                "filter": None,
-                "target_organization_ids": "",
-            },
+
+class TestPaginate(unittest.TestCase):
+    def test_stops_on_short_page(self):
+        fetch = MagicMock(
+            side_effect=[
+                Response(200, {}, data=[{"id": "1"}, {"id": "2"}]),
+                Response(200, {}, data=[{"id": "3"}]),
+            ]
         )
+        result = list(_paginate(fetch, {"page_size": 2, "page": 1}))
+        self.assertEqual(result, [{"id": "1"}, {"id": "2"}, {"id": "3"}])
+        self.assertEqual(fetch.call_count, 2)
 
-    def test_list_all(self):
-        self.rest_client._post.return_value.data = [{"id": "1", "name": "Test Entity"}]
-        response = list(self.entities.list_all(entity_name=self.entity_name))
-        self.assertEqual(response, [{"id": "1", "name": "Test Entity"}])
-        self.rest_client._post.assert_called_once_with(
-            f"entities/{self.entity_name}/entityobjects/list",
-            params={
-                "page_size": 100,
-                "page": 1,
-                "order": None,
-                "group": None,
-                "filter": None,
-                "target_organization_ids": "",
-            },
+    def test_limit(self):
+        fetch = MagicMock(
+            return_value=Response(200, {}, data=[{"id": "1"}, {"id": "2"}])
         )
+        result = list(_paginate(fetch, {"page_size": 2, "page": 1}, limit=3))
+        self.assertEqual(len(result), 3)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_stops_without_next_page(self):
+        fetch = MagicMock(
+            return_value=Response(
+                200, {}, data=[{"id": "1"}, {"id": "2"}], has_next=False
+            )
+        )
+        result = list(_paginate(fetch, {"page_size": 2, "page": 1}))
+        self.assertEqual(len(result), 2)
+        self.assertEqual(fetch.call_count, 1)
 
-    def test_get(self):
-        self.rest_client._get.return_value.data = {"id": "1", "name": "Test Entity"}
-        response = self.entities.get(entity_name=self.entity_name, id="1")
-        self.assertEqual(response, {"id": "1", "name": "Test Entity"})
-        self.rest_client._get.assert_called_once_with(
-            f"entities/{self.entity_name}/entityobjects/1"
+    def test_stops_at_total(self):
+        fetch = MagicMock(
+            return_value=Response(200, {}, data=[{"id": "1"}, {"id": "2"}], total=4)
+        )
+        result = list(_paginate(fetch, {"page_size": 2, "page": 1}))
+        self.assertEqual(len(result), 4)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_prefetches_next_page(self):
+        fetched = threading.Event()
+
+        def fetch(params):
+            if params["page"] == 2:
+                fetched.set()
+                return Response(200, {}, data=[{"id": "3"}])
+            return Response(200, {}, data=[{"id": "1"}, {"id": "2"}])
+
+        records = _paginate(fetch, {"page_size": 2, "page": 1})
+        self.assertEqual(next(records), {"id": "1"})
+        self.assertTrue(fetched.wait(1))
+        self.assertEqual(list(records), [{"id": "2"}, {"id": "3"}])
+
+    @patch("src.boardsonfire_client.endpoints.ThreadPoolExecutor")
+    def test_streamed_pages_are_not_prefetched_without_headers(self, mock_executor):
+        pages = [_Stream(_FULL_PAGE), _Stream(_FULL_PAGE[:50])]
+        fetch = MagicMock(side_effect=[Response(200, {}, data=page) for page in pages])
+
+        result = list(_paginate(fetch, {"page_size": 100, "page": 1}))
+
+        self.assertEqual(len(result), 150)
+        self.assertEqual(fetch.call_count, 2)
+        mock_executor.assert_not_called()
+
+    def test_discarded_prefetch_is_closed(self):
+        pages = [_Stream(_FULL_PAGE), _Stream(_FULL_PAGE)]
+        fetch = MagicMock(
+            side_effect=[Response(200, {}, data=page, has_next=True) for page in pages]
         )
 
-    def test_create(self):
-        data = {
-            "name": "Example",
-            "description": "This is an example entity",
-            "value": 100,
-            "organization_id": "123456",
-        }
-        response_data = {
-            "id": "123456",
-            "name": "Example",
-            "description": "This is an example entity",
-            "value": 100,
-        }
-        self.rest_client._post.return_value.data = response_data
-        result = self.entities.create(self.entity_name, data)
+        records = _paginate(fetch, {"page_size": 100, "page": 1})
+        next(records)
+        records.close()
 
-        self.assertEqual(result, response_data)
+        self.assertTrue(pages[1].closed.wait(1))
+        self.assertTrue(pages[0].closed.is_set())
+        self.assertEqual(fetch.call_count, 2)
 
-        self.rest_client._post.assert_called_once_with(
-            f"entities/{self.entity_name}/entityobjects", data=data
+    def test_pagination_headers(self):
+        self.assertEqual(_pagination({}), {"total": None, "has_next": None})
+        self.assertEqual(
+            _pagination({"X-Total-Count": "42", "Link": '<...?page=2>; rel="next"'}),
+            {"total": 42, "has_next": True},
         )
-
-    def test_create_without_org_id(self):
-        data = {
-            "name": "Example",
-            "description": "This is an example entity",
-            "value": 100,
-        }
-        self.assertRaises(ValidationError, self.entities.create, self.entity_name, data)
-
-    def test_upsert_without_org_id(self):
-        data = [
-            {
-                "name": "Example",
-                "description": "This is an example entity",
-                "value": 100,
-            }
+        self.assertEqual(
+            _pagination({"Link": '<...?page=1>; rel="prev"'})["has_next"], False
+        )
+        self.assertEqual(_pagination({"X-Next-Page": ""})["has_next"], False)
+
+
+_ENTITY_NAME = "test_entity"
+_DATASOURCE_NAME = "test_datasource"
+_ENTITY_URL = f"entities/{_ENTITY_NAME}/entityobjects"
+_ENTITY_LIST_URL = f"{_ENTITY_URL}/list"
+_DATASOURCE_URL = f"datasources/{_DATASOURCE_NAME}/dataobjects"
+_DATASOURCE_LIST_URL = f"{_DATASOURCE_URL}/list"
+
+
+def test_organizations_list(organizations, rest_client):
+    rest_client._get.return_value = MagicMock(
+        data=[{"id": "1", "name": "Org1"}, {"id": "2", "name": "Org2"}]
+    )
+    result = organizations.list()
+    rest_client._get.assert_called_with(
+        "organizations",
+        params=_DEFAULT_LIST_PARAMS_50,
+    )
+    assert result == [{"id": "1", "name": "Org1"}, {"id": "2", "name": "Org2"}]
+
+
+def test_organizations_list_all(organizations, rest_client):
+    rest_client._get.side_effect = _two_pages()
+    result = list(organizations.list_all())
+    assert result == _FULL_PAGE
+    assert rest_client._get.call_count == 2
+    rest_client._get.assert_has_calls(
+        [
+            call("organizations", params=_DEFAULT_LIST_PARAMS_100, stream=False),
+            call(
+                "organizations",
+                params={**_DEFAULT_LIST_PARAMS_100, "page": 2},
+                stream=False,
+            ),
+        ]
+    )
+
+
+def test_organizations_get(organizations, rest_client):
+    rest_client._get.return_value = MagicMock(data={"id": "1", "name": "Org1"})
+    result = organizations.get("1")
+    rest_client._get.assert_called_with("organizations/1")
+    assert result == {"id": "1", "name": "Org1"}
+
+
+def test_users_list(users, rest_client):
+    rest_client._get.return_value.data = [{"id": "1", "name": "Test User"}]
+    response = users.list()
+    assert response == [{"id": "1", "name": "Test User"}]
+    rest_client._get.assert_called_once_with(
+        "users",
+        params=_DEFAULT_LIST_PARAMS_100,
+    )
+
+
+def test_users_list_all(users, rest_client):
+    rest_client._get.side_effect = _two_pages()
+    response = list(users.list_all())
+    assert response == _FULL_PAGE
+    assert rest_client._get.call_count == 2
+    rest_client._get.assert_has_calls(
+        [
+            call("users", params=_DEFAULT_LIST_PARAMS_100, stream=False),
+            call("users", params={**_DEFAULT_LIST_PARAMS_100, "page": 2}, stream=False),
+        ]
+    )
+
+
+def test_users_list_all_stream(users, rest_client):
+    rest_client._get.return_value = Response(
+        200, {}, data=iter([{"id": "1"}]), has_next=False
+    )
+    assert list(users.list_all(stream=True)) == [{"id": "1"}]
+    rest_client._get.assert_called_once_with(
+        "users", params=_DEFAULT_LIST_PARAMS_100, stream=True
+    )
+
+
+def test_users_get(users, rest_client):
+    rest_client._get.return_value.data = {"id": "1", "name": "Test User"}
+    response = users.get("1")
+    assert response == {"id": "1", "name": "Test User"}
+    rest_client._get.assert_called_once_with("users/1")
+
+
+def test_entities_list(entities, rest_client):
+    rest_client._post.return_value.data = [{"id": "1", "name": "Test Entity"}]
+    response = entities.list(entity_name=_ENTITY_NAME)
+    assert response == [{"id": "1", "name": "Test Entity"}]
+    rest_client._post.assert_called_once_with(
+        _ENTITY_LIST_URL,
+        params=_DEFAULT_ENTITY_LIST_PARAMS,
+    )
+
+
+def test_entities_list_organizations(entities, rest_client):
+    rest_client._post.return_value.data = []
+    entities.list(entity_name=_ENTITY_NAME, organizations=["1", "2"])
+    params = rest_client._post.call_args.kwargs["params"]
+    assert params["target_organization_ids"] == "1,2"
+
+
+def test_entities_list_all(entities, rest_client):
+    rest_client._post.side_effect = _two_pages()
+    response = list(entities.list_all(entity_name=_ENTITY_NAME))
+    assert response == _FULL_PAGE
+    assert rest_client._post.call_count == 2
+    rest_client._post.assert_has_calls(
+        [
+            call(_ENTITY_LIST_URL, params=_DEFAULT_ENTITY_LIST_PARAMS, stream=False),
+            call(
+                _ENTITY_LIST_URL,
+                params={**_DEFAULT_ENTITY_LIST_PARAMS, "page": 2},
+                stream=False,
+            ),
         ]
-        self.assertRaises(ValidationError, self.entities.upsert, self.entity_name, data)
+    )
+
+
+def test_entities_get(entities, rest_client):
+    rest_client._get.return_value.data = {"id": "1", "name": "Test Entity"}
+    response = entities.get(entity_name=_ENTITY_NAME, id="1")
+    assert response == {"id": "1", "name": "Test Entity"}
+    rest_client._get.assert_called_once_with(f"{_ENTITY_URL}/1")
+
+
+def test_entities_create(entities, rest_client):
+    rest_client._post.return_value.data = _ENTITY_CREATE_RESPONSE
+    result = entities.create(_ENTITY_NAME, _ENTITY_CREATE_DATA)
+
+    assert result is _ENTITY_CREATE_RESPONSE
+
+    rest_client._post.assert_called_once_with(_ENTITY_URL, data=_ENTITY_CREATE_DATA)
+
+
+def test_entities_create_without_org_id(entities):
+    with pytest.raises(ValidationError):
+        entities.create(_ENTITY_NAME, _ENTITY_CREATE_NO_ORG)
+
+
+def test_entities_upsert_without_org_id(entities):
+    with pytest.raises(ValidationError):
+        entities.upsert(_ENTITY_NAME, [_ENTITY_CREATE_NO_ORG])
+
+
+def test_entities_upsert_batches(entities, rest_client):
+    data = [{"organization_id": str(i)} for i in range(5)]
+    rest_client._post.side_effect = [
+        MagicMock(data=["1", "2"]),
+        MagicMock(data=["3", "4"]),
+        MagicMock(data=["5"]),
+    ]
+    result = entities.upsert(_ENTITY_NAME, data, batch_size=2)
+    assert result == ["1", "2", "3", "4", "5"]
+    assert rest_client._post.call_count == 3
+    rest_client._post.assert_called_with(
+        f"{_ENTITY_URL}/import",
+        data={"entity_objects": data[4:], "delete_others": False},
+    )
+
+
+def test_entities_upsert_single_batch_returns_response_data(entities, rest_client):
+    for body in (None, {"imported": 1}):
+        rest_client._post.return_value.data = body
+        assert entities.upsert(_ENTITY_NAME, [_ORG_ONLY_ROW]) is body
+
+
+def test_entities_upsert_truncate_single_request(entities, rest_client):
+    data = [{"organization_id": str(i)} for i in range(5)]
+    rest_client._post.return_value.data = ["1", "2", "3", "4", "5"]
+    entities.upsert(_ENTITY_NAME, data, truncate=True, batch_size=2)
+    rest_client._post.assert_called_once_with(
+        f"{_ENTITY_URL}/import",
+        data={"entity_objects": data, "delete_others": True},
+    )
+
+
+def test_datasources_list(datasources, rest_client):
+    rest_client._post.return_value.data = [{"id": "1", "name": "Test"}]
+    response = datasources.list(datasource_name=_DATASOURCE_NAME)
+    assert response == [{"id": "1", "name": "Test"}]
+    rest_client._post.assert_called_once_with(
+        _DATASOURCE_LIST_URL,
+        data=_DEFAULT_ENTITY_LIST_PARAMS,
+    )
+
+
+def test_datasources_list_all(datasources, rest_client):
+    rest_client._post.side_effect = _two_pages()
+    response = list(datasources.list_all(datasource_name=_DATASOURCE_NAME))
+    assert response == _FULL_PAGE
+    assert rest_client._post.call_count == 2
+    rest_client._post.assert_has_calls(
+        [
+            call(_DATASOURCE_LIST_URL, data=_DEFAULT_ENTITY_LIST_PARAMS, stream=False),
+            call(
+                _DATASOURCE_LIST_URL,
+                data={**_DEFAULT_ENTITY_LIST_PARAMS, "page": 2},
+                stream=False,
+            ),
+        ]
+    )
 
 
-class TestDataSources(unittest.TestCase):
-    def setUp(self):
-        self.rest_client = MagicMock()
-        self.datasources = DataSources(self.rest_client)
-        self.datasource_name = "test_datasource"
-
-    def test_list(self):
-        self.rest_client._post.return_value.data = [{"id": "1", "name": "Test"}]
-        response = self.datasources.list(datasource_name=self.datasource_name)
-        self.assertEqual(response, [{"id": "1", "name": "Test"}])
-        self.rest_client._post.assert_called_once_with(
-            f"datasources/{self.datasource_name}/dataobjects/list",
-            data={
-                "page_size": 100,
-                "page": 1,
-                "order": None,
-                "group": None,
-                "filter": None,
-                "target_organization_ids": "",
-            },
-        )
+def test_datasources_get(datasources, rest_client):
+    rest_client._get.return_value.data = {"id": "1", "name": "Test"}
+    response = datasources.get(datasource_name=_DATASOURCE_NAME, id="1")
+    assert response == {"id": "1", "name": "Test"}
+    rest_client._get.assert_called_once_with(f"{_DATASOURCE_URL}/1")
 
-    def test_list_all(self):
-        self.rest_client._post.return_value.data = [{"id": "1", "name": "Test"}]
-        response = list(self.datasources.list_all(datasource_name=self.datasource_name))
-        self.assertEqual(response, [{"id": "1", "name": "Test"}])
-        self.rest_client._post.assert_called_once_with(
-            f"datasources/{self.datasource_name}/dataobjects/list",
-            data={
-                "page_size": 100,
-                "page": 1,
-                "order": None,
-                "group": None,
-                "filter": None,
-                "target_organization_ids": "",
-            },
-        )
 
-    def test_get(self):
-        self.rest_client._get.return_value.data = {"id": "1", "name": "Test"}
-        response = self.datasources.get(datasource_name=self.datasource_name, id="1")
-        self.assertEqual(response, {"id": "1", "name": "Test"})
-        self.rest_client._get.assert_called_once_with(
-            f"datasources/{self.datasource_name}/dataobjects/1"
-        )
+def test_datasources_create(datasources, rest_client):
+    rest_client._post.return_value.data = _DATASOURCE_CREATE_RESPONSE
+    result = datasources.create(_DATASOURCE_NAME, _DATASOURCE_CREATE_DATA)
 
-    def test_create(self):
-        data = {
-            "name": "Example",
-            "description": "This is an example dataspurce",
-            "value": 100,
-            "organization_id": "123456",
-            "timestamp": "2022-01-01T00:00:00Z",
-        }
-        response_data = {
-            "id": "123456",
-            "name": "Example",
-            "description": "This is an example dataspurce",
-            "value": 100,
-        }
-        self.rest_client._post.return_value.data = response_data
-        result = self.datasources.create(self.datasource_name, data)
+    assert result is _DATASOURCE_CREATE_RESPONSE
 
-        self.assertEqual(result, response_data)
+    rest_client._post.assert_called_once_with(
+        _DATASOURCE_URL,
+        data=_DATASOURCE_CREATE_DATA,
+    )
 
-        self.rest_client._post.assert_called_once_with(
-            f"datasources/{self.datasource_name}/dataobjects", data=data
-        )
 
-    def test_create_without_org_id(self):
-        data = {
-            "name": "Example",
-            "description": "This is an example datasource",
-            "value": 100,
-        }
-        self.assertRaises(
-            ValidationError, self.datasources.create, self.datasource_name, data
-        )
+def test_datasources_create_without_org_id(datasources):
+    with pytest.raises(ValidationError):
+        datasources.create(_DATASOURCE_NAME, _DATASOURCE_CREATE_NO_ORG)
 
-    def test_upsert_without_org_id(self):
-        data = [
-            {
-                "name": "Example",
-                "description": "This is an example entity",
-                "value": 100,
-            }
-        ]
-        self.assertRaises(
-            ValidationError, self.datasources.upsert, self.datasource_name, data
-        )
+
+def test_datasources_upsert_single_batch_returns_response_data(
+    datasources, rest_client
+):
+    for body in (None, {"imported": 1}):
+        rest_client._post.return_value.data = body
+        assert datasources.upsert(_DATASOURCE_NAME, [_DATASOURCE_ROW]) is body
+
+
+def test_datasources_upsert_without_org_id(datasources):
+    with pytest.raises(ValidationError):
+        datasources.upsert(_DATASOURCE_NAME, [_DATASOURCE_CREATE_NO_ORG])
 
 
 class TestValidateEntity(unittest.TestCase):
     def test_create(self):
-        data = {}
         with self.assertRaises(ValidationError):
-            ValidateEntity.create(data)
+            ValidateEntity.create({})
 
-        data = {"organization_id": "123"}
-        try:
-            ValidateEntity.create(data)
-        except ValidationError:
-            self.fail("ValidateEntity.create() raised ValidationError unexpectedly!")
+        ValidateEntity.create(_ORG_ONLY_ROW)
 
     def test_upsert(self):
-
-        data = [{}]
         with self.assertRaises(ValidationError):
-            ValidateEntity.upsert(data)
+            ValidateEntity.upsert([{}])
 
-        data = [{"organization_id": "123"}, {"organization_id": "456"}]
-        try:
-            ValidateEntity.upsert(data)
-        except ValidationError:
-            self.fail("ValidateEntity.upsert() raised ValidationError unexpectedly!")
+        ValidateEntity.upsert([_ORG_ONLY_ROW, _DATASOURCE_ROW])
 
 
 class TestValidateDataSource(unittest.TestCase):
     def test_create(self):
-        valid_data = {"organization_id": "123", "timestamp": "2022-01-01T00:00:00Z"}
-        invalid_data = {"organization_id": "123"}
-
-        try:
-            ValidateDataSource.create(valid_data)
-        except ValidationError:
-            self.fail("ValidateDataSource.create raised ValidationError unexpectedly!")
+        ValidateDataSource.create(_DATASOURCE_ROW)
 
         with self.assertRaises(ValidationError):
-            ValidateDataSource.create(invalid_data)
+            ValidateDataSource.create(_ORG_ONLY_ROW)
 
     def test_upsert(self):
-        valid_data = [{"organization_id": "123", "timestamp": "2022-01-01T00:00:00Z"}]
-        invalid_data = [{"organization_id": "123"}]
-
-        try:
-            ValidateDataSource.upsert(valid_data)
-        except ValidationError:
-            self.fail("ValidateDataSource.upsert raised ValidationError unexpectedly!")
+        ValidateDataSource.upsert([_DATASOURCE_ROW])
 
         with self.assertRaises(ValidationError):
-            ValidateDataSource.upsert(invalid_data)
+            ValidateDataSource.upsert([_ORG_ONLY_ROW])
+
+
+def _async_resp(status, json_data=None):
+    return SimpleNamespace(
+        status=status,
+        ok=status < 400,
+        headers={},
+        read=AsyncMock(return_value=json.dumps(json_data).encode()),
+    )
+
+
+@unittest.skipIf(async_client is None, "aiohttp is not installed")
+class TestAsyncBoardsOnFireClient(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._patcher = patch("aiohttp.ClientSession.request")
+        cls.mock_request = cls._patcher.start()
+        cls.addClassCleanup(cls._patcher.stop)
+
+    async def asyncSetUp(self):
+        self.mock_request.reset_mock(return_value=True, side_effect=True)
+        self.client = async_client.AsyncBoardsOnFireClient("example.com", "api_key")
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    def _respond(self, *responses):
+        self.mock_request.return_value.__aenter__.side_effect = responses
+
+    async def test_send_request_status_matrix(self):
+        cases = [
+            (200, None, {"data": "test"}, 1),
+            (429, RateLimitException, None, 4),
+            (404, NotFoundException, None, 1),
+            (400, RestClientException, None, 1),
+        ]
+        for status, exc, data, calls in cases:
+            with self.subTest(status=status):
+                self.mock_request.reset_mock(return_value=True, side_effect=True)
+                response = _async_resp(status, data)
+                response.headers = {"Retry-After": "0"}
+                self.mock_request.return_value.__aenter__.return_value = response
+
+                if exc is None:
+                    response = await self.client._send_request("GET", "endpoint")
+                    self.assertEqual(response.data, data)
+                else:
+                    with self.assertRaises(exc):
+                        await self.client._send_request("GET", "endpoint")
+                self.assertEqual(self.mock_request.call_count, calls)
+
+    @patch("src.boardsonfire_client.async_client.retry_delay", return_value=0)
+    async def test_send_request_rate_limit_retry(self, mock_retry_delay):
+        self._respond(_async_resp(429), _async_resp(200, {"data": "test"}))
+
+        response = await self.client._send_request("GET", "endpoint")
+
+        self.assertEqual(response.data, {"data": "test"})
+        self.assertEqual(self.mock_request.call_count, 2)
+        mock_retry_delay.assert_called_once_with({}, 0)
+
+    async def test_send_request_pauses_next_request_when_exhausted(self):
+        response = _async_resp(200, [])
+        response.headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7"}
+        self._respond(response, _async_resp(200, []))
+
+        with patch.object(async_client.asyncio, "sleep", new=AsyncMock()) as sleep:
+            await self.client._send_request("GET", "endpoint")
+            sleep.assert_not_awaited()
+
+            await self.client._send_request("GET", "endpoint")
+            sleep.assert_awaited_once()
+            self.assertAlmostEqual(sleep.await_args.args[0], 7, delta=0.5)
+
+    async def test_send_request_invalid_json(self):
+        response = _async_resp(200)
+        response.read.return_value = b"not json"
+        self._respond(response)
+
+        with self.assertRaises(RestClientException):
+            await self.client._send_request("GET", "endpoint")
+
+    async def test_send_request_drops_none_params(self):
+        self._respond(_async_resp(200, []))
+
+        await self.client._send_request(
+            "GET", "endpoint", params={"page": 1, "order": None}
+        )
+
+        self.assertEqual(
+            self.mock_request.call_args.args,
+            ("GET", "https://example.com.boardsonfireapp.com/api/v5/endpoint"),
+        )
+        self.assertEqual(self.mock_request.call_args.kwargs["params"], {"page": 1})
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    async def test_send_request_serializes_body_with_orjson(self):
+        self._respond(_async_resp(200, []))
+
+        await self.client._send_request("POST", "endpoint", data={"key": "value"})
+
+        kwargs = self.mock_request.call_args.kwargs
+        self.assertEqual(orjson.loads(kwargs["data"]), {"key": "value"})
+        self.assertEqual(kwargs["headers"]["Content-Type"], "application/json")
+        self.assertNotIn("json", kwargs)
+
+    async def test_send_request_delete_without_response(self):
+        self._respond(_async_resp(204), _async_resp(204))
+
+        self.assertIsNone(await self.client._delete("endpoint"))
+        self.assertIsInstance(
+            await self.client._delete("endpoint", return_response=True), Response
+        )
+
+
+@unittest.skipIf(async_client is None, "aiohttp is not installed")
+class TestAsyncUpsert(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        def import_rows(endpoint, data):
+            # entity imports wrap the rows, datasource imports send them as is
+            rows = data["entity_objects"] if isinstance(data, dict) else data
+            return Response(200, {}, data=[row["organization_id"] for row in rows])
+
+        self.rest_client = MagicMock()
+        self.rest_client._post = AsyncMock(side_effect=import_rows)
+        self.data = [{"organization_id": str(i)} for i in range(5)]
+
+    async def test_entities_upsert_batches(self):
+        entities = async_client.AsyncEntities(self.rest_client)
+
+        result = await entities.upsert(_ENTITY_NAME, self.data, batch_size=2)
+
+        self.assertEqual(result, ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.rest_client._post.await_count, 3)
+        self.rest_client._post.assert_awaited_with(
+            f"{_ENTITY_URL}/import",
+            data={"entity_objects": self.data[4:], "delete_others": False},
+        )
+
+    async def test_entities_upsert_truncate_single_request(self):
+        entities = async_client.AsyncEntities(self.rest_client)
+
+        await entities.upsert(_ENTITY_NAME, self.data, truncate=True, batch_size=2)
+
+        self.rest_client._post.assert_awaited_once_with(
+            f"{_ENTITY_URL}/import",
+            data={"entity_objects": self.data, "delete_others": True},
+        )
+
+    async def test_upsert_single_batch_returns_response_data(self):
+        self.rest_client._post = AsyncMock(return_value=Response(200, {}, data=None))
+        entities = async_client.AsyncEntities(self.rest_client)
+        datasources = async_client.AsyncDataSources(self.rest_client)
+
+        self.assertIsNone(await entities.upsert(_ENTITY_NAME, self.data))
+        self.assertIsNone(await datasources.upsert(_DATASOURCE_NAME, [_DATASOURCE_ROW]))
+
+    async def test_datasources_upsert_batches(self):
+        datasources = async_client.AsyncDataSources(self.rest_client)
+        rows = [{**_DATASOURCE_ROW, "organization_id": str(i)} for i in range(5)]
+
+        result = await datasources.upsert(_DATASOURCE_NAME, rows, batch_size=2)
+
+        self.assertEqual(result, ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.rest_client._post.await_count, 3)
+        self.rest_client._post.assert_awaited_with(
+            f"{_DATASOURCE_URL}/import", data=rows[4:]
+        )
+
+
+@unittest.skipIf(async_client is None, "aiohttp is not installed")
+class TestAsyncOrganizations(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.rest_client = MagicMock(_concurrency=2)
+        self.organizations = async_client.AsyncOrganizations(self.rest_client)
+
+    async def test_list_all(self):
+        pages = {1: 100, 2: 100, 3: 1, 4: 0}
+        self.rest_client._get = AsyncMock(
+            side_effect=lambda endpoint, params: Response(
+                200, {}, data=[{"page": params["page"]}] * pages[params["page"]]
+            )
+        )
+        result = [org async for org in self.organizations.list_all()]
+        self.assertEqual(len(result), 201)
+        self.assertEqual(result[-1], {"page": 3})
+        self.assertEqual(
+            [c.kwargs["params"]["page"] for c in self.rest_client._get.call_args_list],
+            [1, 2, 3],
+        )
+
+    async def test_list_all_limit(self):
+        self.rest_client._get = AsyncMock(
+            return_value=Response(200, {}, data=[{"id": str(i)} for i in range(100)])
+        )
+        result = [org async for org in self.organizations.list_all(limit=150)]
+        self.assertEqual(len(result), 150)
+        self.assertEqual(self.rest_client._get.await_count, 2)
+
+    async def test_list_all_total(self):
+        self.rest_client._get = AsyncMock(
+            return_value=Response(
+                200, {}, data=[{"id": str(i)} for i in range(100)], total=300
+            )
+        )
+        result = [org async for org in self.organizations.list_all()]
+        self.assertEqual(len(result), 300)
+        self.assertEqual(self.rest_client._get.await_count, 3)
 
 
 if __name__ == "__main__":
-    unittest.main()
+    raise SystemExit(pytest.main([__file__]))